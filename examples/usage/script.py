@@ -20,11 +20,16 @@ examples_dir = "./examples"
 
 # ================================
 
-from pygenlib.isolate import *
-from pygenlib.testgen import Generator
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from pygenlib import config, testgen
+from pygenlib.isolate import compile_cpp_code
 from pygenlib.clean import clean
-from pygenlib.report import Reporter
-from pygenlib.tgyaml import TgYaml
+from pygenlib.report import report
+from pygenlib.tgyaml import record_tg, export_yaml
 
 logger = logging.getLogger(__name__)
 
@@ -32,37 +37,60 @@ logger = logging.getLogger(__name__)
 tests_dir = "./tests"
 reports_dir = "./reports"
 
-reporter = Reporter(task_name, tests_dir=tests_dir, checker_path=checker_path)
-tg_yaml = TgYaml()
-record_tg = tg_yaml.record_tg
+config.set_task_id(task_name)
+config.override_tests_dir_path(tests_dir)
+config.override_reports_dir_path(reports_dir)
+config.override_checker_path(checker_path)
+for sol_path in solution_paths:
+    config.add_solution(sol_path, is_model=(sol_path == solution_paths[0]))
+
+# Queued (tg_ext, args) tuples; gen_tests() dispatches them in parallel once
+# every subtask has recorded its testgroups.
+_pending_gens = []
 
-model_solution = solution_paths[0]
-generator = Generator(task_name, model_solution, tests_dir=tests_dir)
 def gen(tg_ext, *args):
-    generator.gen(tg_ext, *args)
+    _pending_gens.append((tg_ext, args))
+
+def _gen_one(queued):
+    """Run a single queued generator invocation (top-level so it pickles)."""
+    tg_ext, args = queued
+    testgen.gen(tg_ext, *args)
 
 min_n = 2
 max_n = 500000
 max_freq = 10**9
+sqrt_n = int(max_n**0.5)
 
 def main():
     clean()
     # gen_tests()
-    # tg_yaml.export()
+    # export_yaml()
     # gen_reports()
 
+def _compile_sol(sol_path):
+    with open(sol_path) as f:
+        compile_cpp_code(f.read())
+
 def gen_reports():
     logger.info("Generating reports")
     os.makedirs(reports_dir, exist_ok=True)
-    
+
+    # Compile all solutions concurrently (independent g++ subprocesses),
+    # then run the reports sequentially against the warm compile cache.
+    cpp_sols = [sol for sol in solution_paths if sol.endswith(".cpp")]
+    with ThreadPoolExecutor(max_workers=len(cpp_sols) or 1) as pool:
+        list(pool.map(_compile_sol, cpp_sols))
+
     for sol in solution_paths:
-        reporter.report(sol)
+        report(sol)
 
 
 def gen_tests():
     logger.info("Generating test cases")
     os.makedirs(tests_dir, exist_ok=True)
 
+    # Subtasks record testgroups synchronously (keeps task.yaml ordering)
+    # and queue the actual generator invocations.
     gen_subtask1()
     gen_subtask2()
     gen_subtask3()
@@ -70,6 +98,14 @@ def gen_tests():
     gen_subtask5()
     gen_subtask6()
 
+    # Each gen() spawns independent isolate + g++ subprocesses, so the
+    # queued calls parallelize near-linearly across cores.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        futs = [pool.submit(_gen_one, queued) for queued in _pending_gens]
+        for fut in as_completed(futs):
+            fut.result()
+    _pending_gens.clear()
+
 def gen_subtask1():
     """Copy example files to tests directory"""
     logger.info("Copying example files to tests directory")
@@ -79,8 +115,6 @@ def gen_subtask1():
 
 def gen_subtask2():
     """N <= 10, 13 points"""
-    global max_freq
-   
     curr_tg=1
     record_tg(st=2, tg=curr_tg, pts=2)
     gen(f"{curr_tg:02}a", 10, 1, 5, "star", "random", 1, 5)
@@ -109,9 +143,6 @@ def gen_subtask2():
 
 def gen_subtask3():
     """L=K+1 (freq interval [l,l+1]), 18 points"""
-    global max_n,max_freq
-    sqrt_n = int(max_n**0.5)
-    
     curr_tg=6
     record_tg(st=3, tg=curr_tg, pts=3)
     gen(f"{curr_tg:02}a", max_n, 9, 10, "star", "random", 9, 10)
@@ -144,9 +175,6 @@ def gen_subtask3():
 
 def gen_subtask4():
     """tree is a line graph, 20 points"""
-    global max_n
-    sqrt_n = int(max_n**0.5)
-
     curr_tg=12
     record_tg(st=4, tg=curr_tg, pts=10)
     gen(f"{curr_tg:02}a", max_n, 9, sqrt_n, "line", "random", 9, sqrt_n)
@@ -160,9 +188,6 @@ def gen_subtask4():
 
 def gen_subtask5():
     """all frequencies are the same ([x,x]), 21 points"""
-    global max_n
-    sqrt_n = int(max_n**0.5)
-    
     curr_tg=14
     record_tg(st=5, tg=curr_tg, pts=8)
     gen(f"{curr_tg:02}a", max_n, 10, 10, "star", "random", 8, 12)
@@ -186,9 +211,6 @@ def gen_subtask5():
 
 def gen_subtask6():
     """no additional restrictions, 28 points"""
-    global max_n
-    sqrt_n = int(max_n**0.5)
-
     curr_tg=17
     record_tg(st=6, tg=curr_tg, pts=6)
     gen(f"{curr_tg:02}a", max_n, 1, 10, "star", "random", 1, 10)
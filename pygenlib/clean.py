@@ -1,13 +1,12 @@
-import glob
 import os
 import shutil
 
-from pygenlib import config
+from pygenlib import config, testgen
 
 
 def clean():
     """Cleans up generated files and directories.
-    
+
     Removes:
     - all .out files
     - cache directory
@@ -18,42 +17,38 @@ def clean():
     - task.yaml
     """
 
-    # Remove all .out files
-    for out_file in glob.glob("./**/*.out", recursive=True):
-        os.remove(out_file)
-
-    # Remove cache directory
-    cache_dir = config.get_cache_dir_path()
-    if os.path.exists(cache_dir):
-        shutil.rmtree(cache_dir)
-
-    # Remove all .o files
-    for o_file in glob.glob("./**/*.o", recursive=True):
-        os.remove(o_file)
-
-    # Remove meta.txt files
-    for meta_file in glob.glob("./**/meta.txt", recursive=True):
-        os.remove(meta_file)
-
-    # Remove __pycache__ directories (including in subdirectories)
-    for pycache_dir in glob.glob("./**/__pycache__", recursive=True):
-        shutil.rmtree(pycache_dir)
-
-    # Remove tests directory
-    tests_dir = config.get_tests_dir_path()
-    if os.path.exists(tests_dir):
-        shutil.rmtree(tests_dir)
-
-    # Remove reports directory
-    reports_dir = config.get_reports_dir_path()
-    if os.path.exists(reports_dir):
-        shutil.rmtree(reports_dir)
+    # Directories removed wholesale below — no point walking into them
+    # looking for individual .out/.o/meta.txt files.
+    skip_dirs = {
+        config.get_tests_dir_path(),
+        config.get_cache_dir_path(),
+        config.get_reports_dir_path(),
+        config.get_scores_dir_path(),
+    }
+
+    # Remove .out/.o/meta.txt files and __pycache__ directories in a single
+    # tree walk instead of one recursive glob pass per pattern.
+    for root, dirs, files in os.walk(".", topdown=True):
+        for d in list(dirs):
+            full = os.path.join(root, d)
+            if d == "__pycache__":
+                shutil.rmtree(full)
+                dirs.remove(d)
+            elif os.path.abspath(full) in skip_dirs:
+                dirs.remove(d)
+        for name in files:
+            if (name.endswith(".out") or name.endswith(".o") or name == "meta.txt"
+                    or (name.startswith("meta_") and name.endswith(".txt"))):
+                os.remove(os.path.join(root, name))
+
+    # Remove tests/cache/reports/scores directories wholesale
+    for skip_dir in skip_dirs:
+        if os.path.exists(skip_dir):
+            shutil.rmtree(skip_dir)
+
+    # gen() caches the directories it has created; they are gone now
+    testgen._forget_created_dirs()
 
     # Remove task.yaml
     if os.path.exists("task.yaml"):
         os.remove("task.yaml")
-    
-    # Remove scores directory
-    scores_dir = config.get_scores_dir_path()
-    if os.path.exists(scores_dir):
-        shutil.rmtree(scores_dir)
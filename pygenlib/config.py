@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from typing import Optional
+import functools
 import os
 import re
 
@@ -23,11 +24,13 @@ class CommonConfig:
 
 _conf = CommonConfig()
 
+# task id is a string of alphanumeric characters, hyphens, and underscores
+_TASK_ID_RE = re.compile(r'\A[a-zA-Z0-9_-]+\Z')
+
 def set_task_id(new_task_id):
     global _conf
     # check if the new_task id is well-formed
-    # task id is a string of alphanumeric characters, hyphens, and underscores
-    if not re.match(r'^[a-zA-Z0-9_-]+$', new_task_id):
+    if not _TASK_ID_RE.match(new_task_id):
         raise ValueError(f"task ID {new_task_id} is not well-formed")
     _conf.task_id = new_task_id
 
@@ -37,26 +40,43 @@ def get_task_id() -> str:
         raise ValueError("task ID is not configured")
     return _conf.task_id
 
+@functools.lru_cache(maxsize=256)
 def _normalize_path(path: str) -> str:
     if not path:
         raise ValueError("path cannot be empty")
     return os.path.abspath(os.path.expanduser(path))
 
 
+# Paths that already passed validation this process; getters are called from
+# every gen()/run_cpp_code(), so re-stat'ing them each time adds up.
+_validated: set = set()
+
+
+def _clear_path_caches():
+    _normalize_path.cache_clear()
+    _validated.clear()
+
+
 def _require_existing_file(path: str, description: str) -> str:
     abs_path = _normalize_path(path)
+    if abs_path in _validated:
+        return abs_path
     if not os.path.isfile(abs_path):
         raise FileNotFoundError(f"{description} path '{path}' does not exist or is not a file")
+    _validated.add(abs_path)
     return abs_path
 
 
 def _allow_missing_dir(path: str, description: str) -> str:
     abs_path = _normalize_path(path)
+    if abs_path in _validated:
+        return abs_path
     parent_dir = os.path.dirname(abs_path) or os.path.abspath(os.curdir)
     if not os.path.isdir(parent_dir):
         raise FileNotFoundError(f"parent directory '{parent_dir}' for {description} path '{path}' does not exist")
     if os.path.exists(abs_path) and not os.path.isdir(abs_path):
         raise NotADirectoryError(f"{description} path '{path}' exists but is not a directory")
+    _validated.add(abs_path)
     return abs_path
 
 
@@ -72,12 +92,14 @@ def add_solution(new_solution_path, is_model=False):
 
 def override_generator_path(path):
     global _conf
+    _clear_path_caches()
     _conf.testlib_gen_path = _require_existing_file(path, "testlib generator")
     return _conf.testlib_gen_path
 
 
 def override_checker_path(path):
     global _conf
+    _clear_path_caches()
     _conf.testlib_checker_path = _require_existing_file(path, "testlib checker")
     return _conf.testlib_checker_path
 
@@ -88,43 +110,50 @@ def enable_checker():
 
 def override_testlib_h_path(path):
     global _conf
+    _clear_path_caches()
     _conf.testlib_header_path = _require_existing_file(path, "testlib header")
     return _conf.testlib_header_path
 
 
 def override_tests_dir_path(path):
     global _conf
+    _clear_path_caches()
     _conf.tests_dir = _allow_missing_dir(path, "tests directory")
     return _conf.tests_dir
 
 
 def override_cache_dir_path(path):
     global _conf
+    _clear_path_caches()
     _conf.cache_dir = _allow_missing_dir(path, "cache directory")
     return _conf.cache_dir
 
 
 def override_reports_dir_path(path):
     global _conf
+    _clear_path_caches()
     _conf.reports_dir = _allow_missing_dir(path, "reports directory")
     return _conf.reports_dir
 
 
 def get_cache_dir_path() -> str:
     global _conf
-    _conf.cache_dir = _allow_missing_dir(_conf.cache_dir, "cache directory")
+    if _conf.cache_dir not in _validated:
+        _conf.cache_dir = _allow_missing_dir(_conf.cache_dir, "cache directory")
     return _conf.cache_dir
 
 
 def get_tests_dir_path() -> str:
     global _conf
-    _conf.tests_dir = _allow_missing_dir(_conf.tests_dir, "tests directory")
+    if _conf.tests_dir not in _validated:
+        _conf.tests_dir = _allow_missing_dir(_conf.tests_dir, "tests directory")
     return _conf.tests_dir
 
 
 def get_reports_dir_path() -> str:
     global _conf
-    _conf.reports_dir = _allow_missing_dir(_conf.reports_dir, "reports directory")
+    if _conf.reports_dir not in _validated:
+        _conf.reports_dir = _allow_missing_dir(_conf.reports_dir, "reports directory")
     return _conf.reports_dir
 
 
@@ -132,19 +161,22 @@ def get_testlib_checker_path() -> Optional[str]:
     global _conf
     if not _conf.testlib_checker_path:
         return None
-    _conf.testlib_checker_path = _require_existing_file(_conf.testlib_checker_path, "testlib checker")
+    if _conf.testlib_checker_path not in _validated:
+        _conf.testlib_checker_path = _require_existing_file(_conf.testlib_checker_path, "testlib checker")
     return _conf.testlib_checker_path
 
 
 def get_testlib_header_path() -> str:
     global _conf
-    _conf.testlib_header_path = _require_existing_file(_conf.testlib_header_path, "testlib header")
+    if _conf.testlib_header_path not in _validated:
+        _conf.testlib_header_path = _require_existing_file(_conf.testlib_header_path, "testlib header")
     return _conf.testlib_header_path
 
 
 def get_testlib_gen_path() -> str:
     global _conf
-    _conf.testlib_gen_path = _require_existing_file(_conf.testlib_gen_path, "testlib generator")
+    if _conf.testlib_gen_path not in _validated:
+        _conf.testlib_gen_path = _require_existing_file(_conf.testlib_gen_path, "testlib generator")
     return _conf.testlib_gen_path
 
 
@@ -152,9 +184,24 @@ def get_model_solution_path() -> str:
     global _conf
     if not _conf.model_solution_path:
         raise ValueError("model solution path is not configured")
-    _conf.model_solution_path = _require_existing_file(_conf.model_solution_path, "model solution")
+    if _conf.model_solution_path not in _validated:
+        _conf.model_solution_path = _require_existing_file(_conf.model_solution_path, "model solution")
     return _conf.model_solution_path
 
+def validate_all():
+    """Eagerly validate every configured path; call at startup to fail fast
+    instead of on the first gen()/report() that touches a bad path."""
+    get_cache_dir_path()
+    get_tests_dir_path()
+    get_reports_dir_path()
+    get_scores_dir_path()
+    get_testlib_gen_path()
+    get_testlib_header_path()
+    get_testlib_checker_path()
+    if _conf.model_solution_path:
+        get_model_solution_path()
+
+
 def get_solution_paths() -> list[str]:
     global _conf
     return _conf.solution_paths
@@ -184,5 +231,6 @@ def get_gen_extra_files() -> dict[str, str]:
 
 def get_scores_dir_path() -> str:
     global _conf
-    _conf.scores_dir = _allow_missing_dir(_conf.scores_dir, "scores directory")
+    if _conf.scores_dir not in _validated:
+        _conf.scores_dir = _allow_missing_dir(_conf.scores_dir, "scores directory")
     return _conf.scores_dir
\ No newline at end of file
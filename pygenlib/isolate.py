@@ -1,20 +1,44 @@
-import hashlib
+import atexit
+import fcntl
+import functools
+from contextlib import contextmanager
 from dataclasses import dataclass
+from multiprocessing import util as _mp_util
 import os
 import subprocess
 import tempfile
 import shutil
+import threading
 import logging
 
 from pygenlib import config
 
+try:
+    # Optional: SIMD-accelerated hashing, several times faster than SHA-256
+    # on the multi-KB sources (testlib generators) hashed per compile.
+    from blake3 import blake3 as _content_hash
+except ImportError:
+    from hashlib import sha256 as _content_hash
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Isolate parameters forwarded as --name=value flags
+_NUMERIC_PARAMS = ("mem", "time", "extra-time", "wall-time", "processes", "open-files")
+
+# When set, this box path is trusted as an already-initialized sandbox and
+# init/cleanup are skipped; lets an outer wrapper (or a pool parent) share
+# one box with every pygenlib call in the process tree.
+_BOX_ENV_VAR = "PYGENLIB_ISOLATE_BOX"
+
 @dataclass
 class IsolateResult:
     """Result from running code in isolate sandbox"""
-    stdout: str 
+    # Manual __slots__ (dataclass slots=True needs 3.10, we support 3.9):
+    # one result is built per execution, and slots halve instance memory
+    __slots__ = ("stdout", "stderr", "exit_code", "exec_time", "wall_time",
+                 "status", "killed", "max_rss_kib", "cg_mem_kib")
+    stdout: str
     stderr: str
     exit_code: int
     exec_time: float  # CPU time used
@@ -24,11 +48,13 @@ class IsolateResult:
     max_rss_kib: int  # Peak memory usage in KB
     cg_mem_kib: int  # Memory usage reported by cgroups
 
-def run_cmd_in_isolate(command: str, 
+def run_cmd_in_isolate(command: str,
                           isolate_args: dict = None,
-                          stdin: str = "", box_path: str = None, time_limit: float = 5.0) -> IsolateResult:
+                          stdin: str = "", box_path: str = None, time_limit: float = 5.0,
+                          stdout_path: str = None, stdout_file: str = None,
+                          stdin_file: str = None, stdin_path: str = None) -> IsolateResult:
     """Run arbitrary command in IOI isolate sandbox
-    
+
     Args:
         command: Command to execute (e.g. "python3 solution.py 1 2 3")
         isolate_args: Dictionary of isolate parameters. Defaults to:
@@ -42,7 +68,21 @@ def run_cmd_in_isolate(command: str,
                 "dirs": ["/usr/include", "/usr"],  # Allowed directories
                 "envs": {"HOME": "/box", "PATH": None}  # Environment vars
             }
-        stdin: Input to feed to program
+        stdin: Input to feed to program (str or bytes)
+        stdout_path: When set, stream the program's stdout straight to this
+            file instead of buffering it in memory; IsolateResult.stdout is
+            then empty
+        stdout_file: When set, pass --stdout=<file> so isolate itself
+            redirects the program's stdout inside the sandbox (path is
+            relative to the box), bypassing the pipe to Python entirely;
+            IsolateResult.stdout is then empty
+        stdin_file: When set, pass --stdin=<file> so isolate feeds the
+            program from a file inside the box (path relative to the box),
+            skipping the pipe from Python; the stdin argument is ignored
+        stdin_path: When set, feed the program's stdin from this host file
+            via an inherited descriptor instead of an in-memory string, so
+            peak memory stays bounded no matter how large the input is;
+            the stdin argument is ignored
     """
     logger.debug(f"Running command in isolate: {command}")
     
@@ -58,76 +98,97 @@ def run_cmd_in_isolate(command: str,
         "envs": {"HOME": "/box", "PATH": None}
     }
     
-    if isolate_args is None:
-        isolate_args = default_args
-    else:
-        # Merge with defaults, allowing override
-        merged = default_args.copy()
-        merged.update(isolate_args)
-        isolate_args = merged
+    # Merge with defaults, allowing override
+    isolate_args = {**default_args, **(isolate_args or {})}
 
     logger.debug(f"Using isolate args: {isolate_args}")
 
-    # Start sandbox and get path
+    # Start sandbox and get path; a caller-provided box is left alone so it
+    # can be reused across many runs (see isolate_session)
+    # Resolve the sandbox: a caller/session-provided box is used as-is and
+    # left alone; otherwise one is borrowed from the warm pool for this call
+    pooled_box = None
     if box_path is None:
-        init_proc = subprocess.run(['isolate', '--init', '--cg'], 
-                             capture_output=True, text=True)
-        if init_proc.returncode != 0:
-            logger.error(f"Failed to initialize isolate: {init_proc.stderr}")
-        raise RuntimeError(f"Failed to initialize isolate: {init_proc.stderr}")
-    
-        box_path = init_proc.stdout.strip()
-        logger.debug(f"Initialized sandbox at: {box_path}")
-    
+        env_box = os.environ.get(_BOX_ENV_VAR)
+        if env_box and os.path.isdir(env_box):
+            box_path = env_box
+        else:
+            pooled_box = _acquire_box()
+            box_path = pooled_box
+    box_id = _box_id_of(box_path)
+
     try:
-        # Build isolate command with parameters
-        run_cmd = ["isolate", "--cg"]
-        
-        if isolate_args:
-            # Add numeric parameters
-            for param in ["mem", "time", "extra-time", "wall-time", "processes", "open-files"]:
-                if param in isolate_args:
-                    run_cmd.extend([f"--{param}={isolate_args[param]}"])
-            
-            # Add directory access
-            if "dirs" in isolate_args:
-                for dir_path in isolate_args["dirs"]:
-                    run_cmd.extend([f"--dir={dir_path}"])
-            
-            # Add environment variables
-            if "envs" in isolate_args:
-                for env_name, env_value in isolate_args["envs"].items():
-                    if env_value is None:
-                        run_cmd.extend([f"--env={env_name}"])
-                    else:
-                        run_cmd.extend([f"--env={env_name}={env_value}"])
-        
-        # Add meta file
-        meta_path = os.path.join("meta.txt")
-        run_cmd.extend(["-M", meta_path])
-        
-        # Add command to execute
-        run_cmd.extend(["-s", "--run", "--", f'/usr/bin/bash', '-c', f'{command}'])
-        
+        # Build the whole isolate command in one go: numeric limits,
+        # directory access, environment, meta file, then the command itself.
+        # The meta name is unique per thread so concurrent runs in sibling
+        # boxes never parse or unlink each other's stats.
+        meta_path = f"meta_{os.getpid()}_{threading.get_ident()}.txt"
+        run_cmd = [
+            "isolate", "--cg", f"--box-id={box_id}",
+            *(f"--{param}={isolate_args[param]}" for param in _NUMERIC_PARAMS if param in isolate_args),
+            *(f"--dir={dir_path}" for dir_path in isolate_args.get("dirs", ())),
+            *((f"--env={name}" if value is None else f"--env={name}={value}")
+              for name, value in isolate_args.get("envs", {}).items()),
+            *( [f"--stdout={stdout_file}"] if stdout_file is not None else [] ),
+            *( [f"--stdin={stdin_file}"] if stdin_file is not None else [] ),
+            "-M", meta_path,
+            "-s", "--run", "--", "/usr/bin/bash", "-c", command,
+        ]
+
         logger.debug(f"Running isolate command: {run_cmd}")
-        run_proc = subprocess.run(run_cmd,
-                                input=stdin,
-                                capture_output=True,
-                                text=True)
+        # Feed stdin as bytes and decode output on demand: text=True would
+        # round-trip potentially megabytes of test data through the codec.
+        # An in-box --stdin file needs nothing from us; a host file is
+        # handed over as a descriptor so the program read(2)s it at its own
+        # pace and the input is never held in Python.
+        stdin_handle = None
+        if stdin_file is not None:
+            stdin_kwargs = {"input": b""}
+        elif stdin_path is not None:
+            stdin_handle = open(stdin_path, "rb")
+            stdin_kwargs = {"stdin": stdin_handle}
+        else:
+            stdin_kwargs = {"input": stdin.encode() if isinstance(stdin, str) else (stdin or b"")}
+        try:
+            if stdout_file is not None:
+                # isolate writes the program's stdout itself; only stderr flows back
+                run_proc = subprocess.run(run_cmd,
+                                        stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.PIPE,
+                                        **stdin_kwargs)
+                stdout_text = ""
+            elif stdout_path is not None:
+                with open(stdout_path, "wb") as stdout_fh:
+                    run_proc = subprocess.run(run_cmd,
+                                            stdout=stdout_fh,
+                                            stderr=subprocess.PIPE,
+                                            **stdin_kwargs)
+                stdout_text = ""
+            else:
+                run_proc = subprocess.run(run_cmd,
+                                        capture_output=True,
+                                        **stdin_kwargs)
+                stdout_text = run_proc.stdout.decode(errors="replace")
+        finally:
+            if stdin_handle is not None:
+                stdin_handle.close()
+        stderr_text = run_proc.stderr.decode(errors="replace")
 
-        # Parse meta file (same as before)
-        meta = {}
-        if os.path.exists(meta_path):
-            with open(meta_path) as f:
-                for line in f:
-                    if ":" in line:
-                        key, value = line.strip().split(":", 1)
-                        meta[key] = value
-        
-        os.remove(meta_path)
+        # Parse meta file in a single pass
+        try:
+            with open(meta_path, "rb") as f:
+                raw = f.read()
+            meta = dict(line.split(":", 1) for line in raw.decode().splitlines() if ":" in line)
+        except FileNotFoundError:
+            meta = {}
+        finally:
+            try:
+                os.unlink(meta_path)
+            except FileNotFoundError:
+                pass
         result = IsolateResult(
-            stdout=run_proc.stdout,
-            stderr=run_proc.stderr,
+            stdout=stdout_text,
+            stderr=stderr_text,
             exit_code=run_proc.returncode,
             exec_time=float(meta.get("time", "0")),
             wall_time=float(meta.get("time-wall", "0")),
@@ -139,26 +200,268 @@ def run_cmd_in_isolate(command: str,
         logger.debug(f"Command completed with status: {result.status}, exit code: {result.exit_code}")
         return result
     finally:
-        logger.debug("Cleaning up sandbox")
-        subprocess.run(["isolate", "--cleanup", "--cg"])
-
-def _init_sandbox() -> str:
-    """Initialize isolate sandbox and return box path and stdin path"""
-    logger.debug("Initializing sandbox")
-    init_proc = subprocess.run(['isolate', '--init', '--cg'], 
-                             capture_output=True, text=True)
-    if init_proc.returncode != 0:
-        logger.error(f"Failed to initialize isolate: {init_proc.stderr}")
-        raise RuntimeError(f"Failed to initialize isolate: {init_proc.stderr}")
-    
-    box_path = init_proc.stdout.strip()
-    logger.debug(f"Sandbox initialized at: {box_path}")
-    return box_path
+        if pooled_box is not None:
+            _release_box(pooled_box)
+
+
+def _box_id_of(box_path: str) -> int:
+    """Box id of an initialized box.
+
+    isolate names the box directory after its id, so the path itself
+    carries the id. Recomputing from the pid would be wrong for a box
+    initialized by another process, e.g. one handed down through
+    PYGENLIB_ISOLATE_BOX, whose owner ran --init with its own id.
+    """
+    return int(os.path.basename(os.path.normpath(box_path)))
+
+
+def _init_sandbox(box_id: int) -> str:
+    """Initialize an isolate sandbox under the given id and return its path.
+
+    A leftover box under this id (a crashed or killed earlier run that
+    never reached its cleanup) makes --init fail, so the failure is
+    retried once after a --cleanup instead of raising straight away.
+    """
+    logger.debug(f"Initializing sandbox {box_id}")
+    for attempt in (0, 1):
+        init_proc = subprocess.run(['isolate', '--init', '--cg', f'--box-id={box_id}'],
+                                 capture_output=True, text=True)
+        if init_proc.returncode == 0:
+            box_path = init_proc.stdout.strip()
+            logger.debug(f"Sandbox initialized at: {box_path}")
+            return box_path
+        if attempt == 0:
+            logger.debug(f"Reclaiming stale box {box_id}: {init_proc.stderr.strip()}")
+            subprocess.run(['isolate', '--cleanup', '--cg', f'--box-id={box_id}'],
+                           capture_output=True)
+    logger.error(f"Failed to initialize isolate: {init_proc.stderr}")
+    raise RuntimeError(f"Failed to initialize isolate: {init_proc.stderr}")
+
+
+# Warm per-process pool of sandboxes. Each concurrent session (e.g. a
+# report() worker thread) holds its own initialized box, so parallel runs
+# never share box/solution or attribute stats to the wrong test; released
+# boxes stay initialized for reuse and are cleaned up when the process
+# retires. Ids are claimed machine-wide through flock'd lock files, so
+# concurrently live processes never collide; the pid guard re-seeds a
+# forked child so it never adopts its parent's boxes.
+_BOX_SLOTS = 16       # max concurrently initialized boxes per process
+_BOX_ID_SPACE = 1000  # isolate's box-id range
+
+_box_lock = threading.Condition()
+_free_boxes: list = []   # initialized boxes not currently handed out
+_owned_boxes: list = []  # (box_id, lock_fd) for every box this process holds
+_box_pool_pid = None
+
+
+def _claim_box_id():
+    """Reserve a machine-wide free box id; returns (box_id, lock_fd).
+
+    Each id is guarded by a flock'd file held open for the life of the
+    process: the kernel drops the lock on any exit — including the
+    os._exit that multiprocessing workers die by — so live processes
+    never share an id and ids of dead ones are immediately reclaimable.
+    Probing starts at a pid-scattered offset to keep contention rare.
+    """
+    lock_dir = os.path.join(tempfile.gettempdir(), "pygenlib-box-locks")
+    os.makedirs(lock_dir, exist_ok=True)
+    start = (os.getpid() * _BOX_SLOTS) % _BOX_ID_SPACE
+    for offset in range(_BOX_ID_SPACE):
+        box_id = (start + offset) % _BOX_ID_SPACE
+        fd = os.open(os.path.join(lock_dir, f"{box_id}.lock"), os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            continue
+        return box_id, fd
+    raise RuntimeError("all isolate box ids are in use")
+
+
+def _acquire_box() -> str:
+    """Take a warm box out of the pool, initializing a new one while free
+    slots remain; blocks when all _BOX_SLOTS boxes are handed out."""
+    global _box_pool_pid
+    with _box_lock:
+        if _box_pool_pid != os.getpid():
+            # forked child: the inherited boxes belong to the parent, and
+            # so do the inherited lock fds — closing them would drop the
+            # parent's flocks, so the references are only forgotten
+            _free_boxes.clear()
+            _owned_boxes.clear()
+            _box_pool_pid = os.getpid()
+            atexit.register(_cleanup_boxes)
+            # multiprocessing workers (gen_all's pool) die via os._exit,
+            # which skips atexit — but their bootstrap does run
+            # multiprocessing finalizers, so boxes are still torn down
+            # deterministically when a worker retires
+            _mp_util.Finalize(None, _cleanup_boxes, exitpriority=0)
+        while not _free_boxes and len(_owned_boxes) >= _BOX_SLOTS:
+            _box_lock.wait()
+        if _free_boxes:
+            return _free_boxes.pop()
+        box_id, lock_fd = _claim_box_id()
+        _owned_boxes.append((box_id, lock_fd))
+    # --init runs outside the lock (it takes tens of ms and other threads
+    # may be returning boxes meanwhile); a failure gives the slot back
+    try:
+        return _init_sandbox(box_id)
+    except BaseException:
+        with _box_lock:
+            _owned_boxes.remove((box_id, lock_fd))
+            os.close(lock_fd)
+            _box_lock.notify()
+        raise
+
+
+def _release_box(box_path: str):
+    with _box_lock:
+        _free_boxes.append(box_path)
+        _box_lock.notify()
+
+
+def _cleanup_boxes():
+    if _box_pool_pid != os.getpid():
+        return
+    logger.debug("Cleaning up sandboxes")
+    for box_id, lock_fd in _owned_boxes:
+        subprocess.run(["isolate", "--cleanup", "--cg", f"--box-id={box_id}"],
+                       capture_output=True)
+        os.close(lock_fd)
+    _owned_boxes.clear()
+    _free_boxes.clear()
+
+
+@contextmanager
+def isolate_session():
+    """Hand out a warm isolate box for a run of related calls.
+
+    The --init/--cleanup cgroup cycle costs tens to hundreds of ms per call;
+    boxes are initialized lazily, returned to the pool on session exit, and
+    cleaned up at interpreter exit, so a whole batch pays for a handful of
+    inits. Concurrent sessions each get their own box.
+    """
+    env_box = os.environ.get(_BOX_ENV_VAR)
+    if env_box and os.path.isdir(env_box):
+        # externally owned box: no init, no cleanup
+        yield env_box
+        return
+
+    box_path = _acquire_box()
+    # Export the box so subprocesses spawned during the session join it.
+    # os.environ is process-global, so only the main thread exports; worker
+    # threads hold private boxes and must not clobber each other's exports.
+    exported = threading.current_thread() is threading.main_thread()
+    if exported:
+        os.environ[_BOX_ENV_VAR] = box_path
+    try:
+        yield box_path
+    finally:
+        if exported:
+            os.environ.pop(_BOX_ENV_VAR, None)
+        _release_box(box_path)
+
+
+# In-process map of source checksum -> cached executable path, so warm
+# calls skip the cache-directory lookup entirely.
+_exe_cache: dict = {}
+
+# Flags for solution builds; part of the cache key below. -static trades a
+# slower (once-per-source, cached) link for sandbox runs that skip the
+# dynamic linker entirely — binaries run N tests each.
+_COMPILE_FLAGS = ("-O2", "-static", "-std=c++17")
+
+# Flags for generator-style builds that run once: compile time dwarfs
+# runtime there, and -O0 -pipe compiles several times faster.
+_FAST_COMPILE_FLAGS = ("-O0", "-pipe", "-w", "-std=c++17")
+
+# Front the compiler with ccache when installed for a global compile cache.
+_CCACHE = shutil.which("ccache")
+
+
+@functools.lru_cache(maxsize=None)
+def _compiler_signature(flags: tuple) -> str:
+    """g++ version line plus compile flags.
+
+    Folded into the executable cache key so cached binaries survive across
+    processes but are invalidated when the compiler or flags change.
+    """
+    try:
+        proc = subprocess.run(["g++", "--version"], capture_output=True, text=True)
+        version = proc.stdout.splitlines()[0] if proc.stdout else ""
+    except OSError:
+        version = ""
+    return f"{version} {' '.join(flags)}"
+
+
+@functools.lru_cache(maxsize=256)
+def _source_checksum(source_code: str, extra_items: tuple, signature: str = "") -> str:
+    """Checksum of source plus sorted (filename, content) extra file pairs.
+
+    Memoized so repeated calls with the same source string (the common case
+    when one generator produces many tests) skip re-hashing: CPython caches
+    str hashes, so the lru_cache lookup is O(1) on a warm string.
+    """
+    m = _content_hash()
+    m.update(source_code.encode() if isinstance(source_code, str) else source_code)
+    for filename, content in extra_items:
+        m.update(filename.encode())
+        m.update(content.encode() if isinstance(content, str) else content)
+    if signature:
+        m.update(signature.encode())
+    return m.hexdigest()
 
 
-def run_cpp_code(source_code: str, stdin: str, time_limit: float = 5.0, args: list = None, extra_compile_files: dict = None, extra_run_files: dict = None) -> IsolateResult:
+def _write_file_bytes(path: str, content):
+    """Write a whole file with one open/write/close, no buffering layer.
+
+    Accepts str or bytes; the direct os.write path skips the text-wrapper
+    overhead of open(...).write() for every sandbox file.
+    """
+    data = content.encode() if isinstance(content, str) else content
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _publish_file_bytes(path: str, content):
+    """Atomically materialize a file via a pid-suffixed temp name + rename.
+
+    Concurrent pool workers filling the same build dir then never see (or
+    compile) a partially written file from an exists() check; last rename
+    wins with complete, identical bytes.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    _write_file_bytes(tmp_path, content)
+    os.rename(tmp_path, path)
+
+
+def _copy_if_changed(src: str, dst: str):
+    """Materialize src at dst unless dst already matches by size and mtime.
+
+    Prefers a hardlink (one directory-entry syscall) over a full byte copy;
+    falls back to copy2 across filesystems.
+    """
+    try:
+        src_stat = os.stat(src)
+        dst_stat = os.stat(dst)
+        if src_stat.st_size == dst_stat.st_size and src_stat.st_mtime == dst_stat.st_mtime:
+            return
+        os.remove(dst)
+    except OSError:
+        pass
+    try:
+        os.link(src, dst)
+        os.chmod(dst, 0o755)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def run_cpp_code(source_code: str, stdin: str, time_limit: float = 5.0, args: list = None, extra_compile_files: dict = None, extra_run_files: dict = None, optimize: bool = True, box_path: str = None, stdout_path: str = None, precompiled_path: str = None, stdout_file: str = None, stdin_file: str = None, stdin_path: str = None) -> IsolateResult:
     """Run C++ code in IOI isolate sandbox.
-    
+
     Args:
         source_code: C++ source code to compile and run
         stdin: Input to feed to program
@@ -166,100 +469,142 @@ def run_cpp_code(source_code: str, stdin: str, time_limit: float = 5.0, args: li
         args: Command line arguments to pass to program
         extra_compile_files: Dictionary mapping filenames to file contents to include in compilation directory
         extra_run_files: Dictionary mapping filenames to file contents to include in run directory
+        optimize: Compile with -O2 (solutions). Pass False for run-once code
+            like generators, where -O0 compiles much faster
+        box_path: Existing sandbox from isolate_session(); one is created
+            (and cleaned up) per call when omitted
+        stdout_path: When set, the program's stdout is written straight to
+            this file instead of being buffered (see run_cmd_in_isolate)
+        precompiled_path: Executable from an earlier compile_cpp_code call;
+            skips hashing and cache lookup entirely, for callers that run
+            the same binary against many inputs
+        stdout_file/stdin_file: In-box redirection, see run_cmd_in_isolate;
+            together they let one program's output feed the next run
+            without the data ever passing through Python
+        stdin_path: Host file fed to the program as its stdin descriptor
+            (see run_cmd_in_isolate); bounded memory for any input size
     """
     logger.debug("Running C++ code")
-    box_path = _init_sandbox()
-    
-    # Calculate checksum of source and additional files
-    m = hashlib.sha256()
-    m.update(source_code.encode())
-    if extra_compile_files:
-        for filename in sorted(extra_compile_files.keys()):
-            m.update(filename.encode())
-            m.update(extra_compile_files[filename].encode())
-    checksum = m.hexdigest()
-    
-    # Check cache directory
-    cache_dir = config.get_cache_dir_path()
-    os.makedirs(cache_dir, exist_ok=True)
-    cached_exe = os.path.join(cache_dir, checksum)
-    
-    def _write_run_files():
-        if not extra_run_files:
-            return
+
+    if box_path is None:
+        with isolate_session() as session_box:
+            return run_cpp_code(source_code, stdin, time_limit, args,
+                                extra_compile_files, extra_run_files,
+                                optimize, box_path=session_box,
+                                stdout_path=stdout_path,
+                                precompiled_path=precompiled_path,
+                                stdout_file=stdout_file, stdin_file=stdin_file,
+                                stdin_path=stdin_path)
+
+    cached_exe = precompiled_path or compile_cpp_code(source_code, extra_compile_files, optimize)
+
+    # Move executable to sandbox (hardlink from the cache when possible)
+    box_exe_path = os.path.join(box_path, "box", "solution")
+    logger.debug(f"Moving executable to sandbox: {box_exe_path}")
+    _copy_if_changed(cached_exe, box_exe_path)
+
+    # Copy extra files to sandbox
+    if extra_run_files:
         for filename, content in extra_run_files.items():
             file_path = os.path.join(box_path, "box", filename)
             dir_path = os.path.dirname(file_path)
             if dir_path:
                 os.makedirs(dir_path, exist_ok=True)
             logger.debug(f"Moving extra run file to sandbox: {file_path}")
-            with open(file_path, "w") as f:
-                f.write(content)
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"Extra run file not found: {file_path}")
+            _write_file_bytes(file_path, content)
+
+    return run_cmd_in_isolate(f"./solution {' '.join(args) if args else ''}", None, stdin, box_path=box_path, time_limit=time_limit, stdout_path=stdout_path, stdout_file=stdout_file, stdin_file=stdin_file, stdin_path=stdin_path)
+
+
+def compile_cpp_code(source_code: str, extra_compile_files: dict = None, optimize: bool = True) -> str:
+    """Compile C++ source and return the path to the cached executable.
+
+    Pure cache fill with no sandbox involved, so independent solutions can
+    be compiled concurrently (the GIL is released during subprocess waits);
+    a later run_cpp_code with the same source is then a pure cache hit.
+
+    Args:
+        source_code: C++ source code to compile
+        extra_compile_files: Mapping (or pre-sorted (filename, content)
+            tuple) of files placed next to the source for compilation
+        optimize: Compile with -O2; False selects the fast -O0 flag set
+    """
+    flags = _COMPILE_FLAGS if optimize else _FAST_COMPILE_FLAGS
 
+    # A pre-sorted tuple of (filename, content) pairs is accepted as-is,
+    # letting callers that cache one skip the per-call sort.
+    if isinstance(extra_compile_files, tuple):
+        extra_items = extra_compile_files
+    else:
+        extra_items = tuple(sorted(extra_compile_files.items())) if extra_compile_files else ()
+    checksum = _source_checksum(source_code, extra_items, _compiler_signature(flags))
+
+    # Check cache directory
+    cached_exe = _exe_cache.get(checksum)
+    if cached_exe is not None and os.path.exists(cached_exe):
+        return cached_exe
+    cache_dir = config.get_cache_dir_path()
+    os.makedirs(cache_dir, exist_ok=True)
+    cached_exe = os.path.join(cache_dir, checksum)
     if os.path.exists(cached_exe):
         logger.debug("Found cached executable")
-        # Copy from cache to sandbox
-        box_exe_path = os.path.join(box_path, "box", "solution")
-        shutil.copy2(cached_exe, box_exe_path)
-        assert os.path.exists(box_exe_path)
-        _write_run_files()
-        return run_cmd_in_isolate(f"./solution {' '.join(args) if args else ''}", None, stdin, box_path=box_path, time_limit=time_limit)
-    
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Set up compilation
-        src_path = os.path.join(tmpdir, "solution.cpp")
-        exe_name = "solution"
-        
-        # Write source
+        _exe_cache[checksum] = cached_exe
+        return cached_exe
+
+    # Persistent per-checksum build dir instead of a throwaway tempdir: the
+    # checksum covers source, extra files, and flags, so existing files are
+    # known-good and repeat compilations skip every write (testlib.h alone
+    # is ~200KB per call otherwise)
+    build_dir = os.path.join(cache_dir, "build", checksum)
+    os.makedirs(build_dir, exist_ok=True)
+
+    src_path = os.path.join(build_dir, "solution.cpp")
+    # pid-suffixed output: parallel cold-cache workers (gen_all forks) may
+    # build the same checksum concurrently and must not share an -o target
+    exe_name = f"solution.{os.getpid()}"
+
+    if not os.path.exists(src_path):
         logger.debug(f"Writing source to {src_path}")
-        with open(src_path, "w") as f:
-            f.write(source_code)
+        _publish_file_bytes(src_path, source_code)
 
-        # Write any additional files
-        if extra_compile_files:
-            for filename, content in extra_compile_files.items():
-                file_path = os.path.join(tmpdir, filename)
-                logger.debug(f"Writing additional file: {file_path}")
-                with open(file_path, "w") as f:
-                    f.write(content)
-
-        # Compile
-        logger.debug("Compiling C++ code")
-        compile_cmd = ["g++", "-O2", "-std=c++17", src_path, "-o", 
-                        os.path.join(tmpdir, exe_name)]
-        
-        compile_proc = subprocess.run(compile_cmd,
-                                      cwd=tmpdir,
-                                    capture_output=True,
-                                    text=True)
-        if compile_proc.returncode != 0:
-            logger.error(f"Compilation failed: {compile_proc.stderr}")
-            raise RuntimeError(f"Compilation failed: {compile_proc.stderr}")
-
-        # Cache the executable
-        logger.debug(f"Caching executable to {cached_exe}")
-        shutil.copy2(os.path.join(tmpdir, exe_name), cached_exe)
-
-        # Move executable to sandbox
-        box_exe_path = os.path.join(box_path, "box", exe_name)
-        logger.debug(f"Moving executable to sandbox: {box_exe_path}")
-        shutil.copy2(os.path.join(tmpdir, exe_name), box_exe_path)
+    for filename, content in extra_items:
+        file_path = os.path.join(build_dir, filename)
+        if not os.path.exists(file_path):
+            logger.debug(f"Writing additional file: {file_path}")
+            _publish_file_bytes(file_path, content)
 
-        # make sure that the executable is in the box
-        assert os.path.exists(box_exe_path)
+    # Compile
+    logger.debug("Compiling C++ code")
+    compile_cmd = ([_CCACHE] if _CCACHE else []) + \
+                  ["g++", *flags, src_path, "-o",
+                    os.path.join(build_dir, exe_name)]
 
-        # Copy extra files to sandbox
-        _write_run_files()
+    compile_proc = subprocess.run(compile_cmd,
+                                  cwd=build_dir,
+                                capture_output=True,
+                                text=True)
+    if compile_proc.returncode != 0:
+        logger.error(f"Compilation failed: {compile_proc.stderr}")
+        raise RuntimeError(f"Compilation failed: {compile_proc.stderr}")
 
-        return run_cmd_in_isolate(f"./{exe_name} {' '.join(args) if args else ''}", None, stdin, box_path=box_path, time_limit=time_limit)
+    # Publish the executable atomically: build dir and cache dir share a
+    # filesystem, so the rename means workers that exists()-check or exec
+    # cached_exe never see a partial binary
+    logger.debug(f"Caching executable to {cached_exe}")
+    os.rename(os.path.join(build_dir, exe_name), cached_exe)
+    _exe_cache[checksum] = cached_exe
+    return cached_exe
 
-def run_py_code(source_code: str, stdin: str, time_limit: float = 5.0, extra_args: list = None) -> IsolateResult:
+def run_py_code(source_code: str, stdin: str, time_limit: float = 5.0, extra_args: list = None, box_path: str = None, stdout_path: str = None, stdin_path: str = None) -> IsolateResult:
     """Run Python code in IOI isolate sandbox"""
     logger.debug("Running Python code")
-    box_path = _init_sandbox()
-    
+
+    if box_path is None:
+        with isolate_session() as session_box:
+            return run_py_code(source_code, stdin, time_limit, extra_args,
+                               box_path=session_box, stdout_path=stdout_path,
+                               stdin_path=stdin_path)
+
     with tempfile.TemporaryDirectory() as tmpdir:
         # Set up file
         src_path = os.path.join(tmpdir, "solution.py")
@@ -279,4 +624,4 @@ def run_py_code(source_code: str, stdin: str, time_limit: float = 5.0, extra_arg
         cmd = ["python3"]
         cmd.append(exe_name)
         
-        return run_cmd_in_isolate(f"{' '.join(cmd)} {' '.join(extra_args) if extra_args else ''}", None, stdin, box_path=box_path, time_limit=time_limit)
+        return run_cmd_in_isolate(f"{' '.join(cmd)} {' '.join(extra_args) if extra_args else ''}", None, stdin, box_path=box_path, time_limit=time_limit, stdout_path=stdout_path, stdin_path=stdin_path)
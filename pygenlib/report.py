@@ -1,13 +1,20 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Optional, Tuple
+import itertools
+import json
+import re
 
-from pygenlib.isolate import run_cpp_code, run_py_code
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pygenlib.isolate import compile_cpp_code, run_cpp_code, run_py_code
 from pygenlib import config
 import csv
+import functools
 import logging
 import os
 import shutil
 import tempfile
+import threading
 import subprocess
 import hashlib
 
@@ -43,11 +50,17 @@ def override_reporter_config(cfg: ReporterConfig):
     _default_reporter_config = cfg
 
 
-def report(sol_path, output_file=None, cfg: Optional[ReporterConfig] = None):
-    """Generate a TSV report for the provided solution path."""
+def report(sol_path, output_file=None, cfg: Optional[ReporterConfig] = None, use_cache: bool = True):
+    """Generate a TSV report for the provided solution path.
+
+    Verdicts are cached under cache_dir/verdicts keyed on the solution,
+    test, answer, and checker, so unchanged (solution, test) pairs skip the
+    sandbox run entirely; pass use_cache=False to force re-runs.
+    """
     cfg = _resolve_reporter_config(cfg)
     lang = _detect_language(sol_path)
     checker_executable = _compile_checker(cfg) if cfg.checker_path else None
+    checker_driver = _compile_checker_driver(cfg) if checker_executable else None
     include_checker_msg = checker_executable is not None
 
     logger.debug(f"Generating report for solution: {sol_path}")
@@ -60,23 +73,57 @@ def report(sol_path, output_file=None, cfg: Optional[ReporterConfig] = None):
 
     output_path = _resolve_output_path(sol_path, output_file, cfg)
     os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    _initialize_report_file(output_path, include_checker_msg)
 
-    test_files = sorted(
-        f for f in os.listdir(cfg.tests_dir) if f.startswith(f"{cfg.task_name}.i")
+    # scandir keeps DirEntry objects around, so entry.path below costs no
+    # extra join/stat per file
+    prefix = f"{cfg.task_name}.i"
+    test_entries = sorted(
+        (entry for entry in os.scandir(cfg.tests_dir) if entry.name.startswith(prefix)),
+        key=lambda entry: entry.name,
     )
-    logger.debug(f"Found {len(test_files)} test files to process")
-
-    for test_file in test_files:
-        full_test_path = os.path.join(cfg.tests_dir, test_file)
-        logger.debug(f"Running test: {test_file}")
-        result = _run_test(
-            full_test_path,
-            sol_code,
-            lang,
-            checker_executable,
-        )
-        _append_result(output_path, result, include_checker_msg)
+    logger.debug(f"Found {len(test_entries)} test files to process")
+
+    suite = _get_test_suite(cfg.tests_dir, cfg.task_name)
+    suite.prefetch(test_entries)
+
+    # Compile the solution once up front; the per-test runs then exec the
+    # binary without re-hashing the source N times.
+    precompiled = compile_cpp_code(sol_code) if lang == "cpp" else None
+
+    # Each test is an independent sandbox subprocess, so run them through a
+    # thread pool (workers sit in subprocess waits, not holding the GIL) and
+    # write the rows in test order once every verdict is in.
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            futures = {
+                pool.submit(
+                    _run_test,
+                    entry.path,
+                    sol_code,
+                    lang,
+                    checker_executable,
+                    use_cache,
+                    checker_driver,
+                    suite,
+                    precompiled,
+                ): entry.name
+                for entry in test_entries
+            }
+            results = {futures[fut]: fut.result() for fut in as_completed(futures)}
+    finally:
+        # one sweep instead of per-test checker tempfile cleanup; also runs
+        # when a test raises, so driver co-processes and scratch files
+        # never outlive the report
+        _shutdown_checker_workers()
+        shutil.rmtree(_scratch_dir(), ignore_errors=True)
+
+    # One open + one buffered writer for the whole report instead of an
+    # open/close pair per row
+    with open(output_path, "w", newline="", buffering=1024 * 1024) as f:
+        writer = csv.writer(f, delimiter="\t")
+        _write_report_header(writer, include_checker_msg)
+        for entry in test_entries:
+            _append_result(writer, results[entry.name], include_checker_msg)
 
     logger.debug(f"Results written to {output_path}")
 
@@ -96,6 +143,18 @@ def _resolve_reporter_config(reporter_config: Optional[ReporterConfig]) -> Repor
     )
 
 
+def _checker_flags() -> list:
+    """Compile flags for the checker; it runs once per test, so optimize hard.
+
+    -march=native is opt-in via PYGENLIB_CHECKER_NATIVE=1 since the cached
+    binary would not be portable across machines.
+    """
+    flags = ["-std=c++17", "-O3", "-flto", "-pipe"]
+    if os.environ.get("PYGENLIB_CHECKER_NATIVE") == "1":
+        flags.append("-march=native")
+    return flags
+
+
 def _compile_checker(cfg: ReporterConfig) -> Optional[str]:
     if cfg.checker_path is None:
         return None
@@ -104,62 +163,396 @@ def _compile_checker(cfg: ReporterConfig) -> Optional[str]:
         logger.error(f"Checker file not found: {cfg.checker_path}")
         return None
 
-    os.makedirs(cfg.cache_dir, exist_ok=True)
+    # mtimes in the memo key make repeated report() calls in one session
+    # constant-time while still picking up edits to either source
+    return _compile_checker_cached(
+        cfg.checker_path,
+        cfg.testlib_path,
+        cfg.cache_dir,
+        os.stat(cfg.checker_path).st_mtime_ns,
+        os.stat(cfg.testlib_path).st_mtime_ns,
+    )
+
 
-    hash_ctx = hashlib.md5()
-    hash_ctx.update(cfg.checker_path.encode())
-    hash_ctx.update(str(os.path.getmtime(cfg.checker_path)).encode())
-    hash_ctx.update(cfg.testlib_path.encode())
-    hash_ctx.update(str(os.path.getmtime(cfg.testlib_path)).encode())
+@functools.lru_cache(maxsize=32)
+def _compile_checker_cached(checker_path: str, testlib_path: str, cache_dir: str, checker_mtime_ns: int, testlib_mtime_ns: int) -> Optional[str]:
+    os.makedirs(cache_dir, exist_ok=True)
+
+    with open(checker_path, "r") as f:
+        checker_content = f.read()
+    with open(testlib_path, "r") as f:
+        testlib_content = f.read()
+
+    # Content-addressed cache key: hashing the sources (not paths+mtimes)
+    # invalidates the cached binary when checker.cpp or testlib.h actually
+    # change and shares it between projects with identical checker code
+    flags = _checker_flags()
+    hash_ctx = hashlib.blake2b(digest_size=16)
+    hash_ctx.update(testlib_content.encode())
+    hash_ctx.update(b"\0")
+    hash_ctx.update(checker_content.encode())
+    hash_ctx.update(f"\0g++ {' '.join(flags)}".encode())
     checker_hash = hash_ctx.hexdigest()
-    checker_exe_path = os.path.join(cfg.cache_dir, f"checker_{checker_hash}")
+    checker_exe_path = os.path.join(cache_dir, f"checker_{checker_hash}")
 
     if os.path.exists(checker_exe_path):
         logger.debug(f"Using cached checker: {checker_exe_path}")
         return checker_exe_path
 
-    compile_dir = tempfile.mkdtemp(dir=cfg.cache_dir, prefix="checker-src-")
+    # Persistent compile dir; rewriting ~200KB of testlib.h on every miss
+    # is skipped when the bytes on disk already match
+    compile_dir = os.path.join(cache_dir, "checker-src")
+    os.makedirs(compile_dir, exist_ok=True)
     checker_src_path = os.path.join(compile_dir, "checker.cpp")
     testlib_copy_path = os.path.join(compile_dir, "testlib.h")
 
-    with open(cfg.checker_path, "r") as f_in, open(checker_src_path, "w") as f_out:
-        f_out.write(f_in.read())
-
-    with open(cfg.testlib_path, "r") as f_in, open(testlib_copy_path, "w") as f_out:
-        f_out.write(f_in.read())
+    _write_if_changed(checker_src_path, checker_content)
+    _write_if_changed(testlib_copy_path, testlib_content)
 
     compile_cmd = [
         "g++",
-        "-std=c++17",
-        "-O2",
+        *flags,
         checker_src_path,
         "-o",
         checker_exe_path,
     ]
     logger.debug(f"Compiling checker with command: {' '.join(compile_cmd)}")
     try:
-        subprocess.run(compile_cmd, check=True, cwd=compile_dir)
+        _run_gxx(compile_cmd)
         logger.debug(f"Checker compiled successfully: {checker_exe_path}")
         return checker_exe_path
     except subprocess.CalledProcessError as exc:
         logger.error(f"Failed to compile checker: {exc}")
         return None
-    finally:
-        shutil.rmtree(compile_dir, ignore_errors=True)
 
 
-def _run_test(test_file: str, sol_code: str, lang: str, checker_executable: Optional[str]) -> TestCaseResult:
+# Wrapper that turns the checker into a co-process: the checker's main is
+# renamed to checker_main via -Dmain=checker_main and linked in, then each
+# "input participant jury" line on stdin is served by a fork()ed child.
+# exec, dynamic linking, and testlib static init are paid once per suite
+# instead of once per test.
+_CHECKER_DRIVER_SRC = """\
+#include <iostream>
+#include <string>
+#include <sys/wait.h>
+#include <unistd.h>
+
+int checker_main(int argc, char* argv[]);
+
+int main() {
+    std::ios::sync_with_stdio(false);
+    std::string input, participant, jury;
+    while (std::cin >> input >> participant >> jury) {
+        int msg_pipe[2];
+        if (pipe(msg_pipe) != 0)
+            return 2;
+        pid_t pid = fork();
+        if (pid < 0)
+            return 2;
+        if (pid == 0) {
+            close(msg_pipe[0]);
+            dup2(msg_pipe[1], 1);
+            dup2(msg_pipe[1], 2);
+            close(msg_pipe[1]);
+            char prog[] = "checker";
+            char* argv_c[] = {prog, &input[0], &participant[0], &jury[0], nullptr};
+            _exit(checker_main(4, argv_c));
+        }
+        close(msg_pipe[1]);
+        std::string msg;
+        char buf[4096];
+        ssize_t n;
+        while ((n = read(msg_pipe[0], buf, sizeof buf)) > 0)
+            msg.append(buf, n);
+        close(msg_pipe[0]);
+        int status = 0;
+        waitpid(pid, &status, 0);
+        int rc = WIFEXITED(status) ? WEXITSTATUS(status) : 3;
+        for (char& c : msg)
+            if (c == '\\n' || c == '\\t' || c == '\\r')
+                c = ' ';
+        std::cout << rc << '\\t' << msg << '\\n' << std::flush;
+    }
+    return 0;
+}
+"""
+
+
+def _compile_checker_driver(cfg: ReporterConfig) -> Optional[str]:
+    """Build the persistent checker driver; None if the checker is not
+    wrapper-compatible (callers then fall back to one-shot runs)."""
+    return _compile_checker_driver_cached(
+        cfg.checker_path,
+        cfg.testlib_path,
+        cfg.cache_dir,
+        os.stat(cfg.checker_path).st_mtime_ns,
+        os.stat(cfg.testlib_path).st_mtime_ns,
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_checker_driver_cached(checker_path: str, testlib_path: str, cache_dir: str, checker_mtime_ns: int, testlib_mtime_ns: int) -> Optional[str]:
+    with open(checker_path, "r") as f:
+        checker_content = f.read()
+    with open(testlib_path, "r") as f:
+        testlib_content = f.read()
+
+    flags = _checker_flags()
+    hash_ctx = hashlib.blake2b(digest_size=16)
+    hash_ctx.update(b"driver\0")
+    hash_ctx.update(testlib_content.encode())
+    hash_ctx.update(b"\0")
+    hash_ctx.update(checker_content.encode())
+    hash_ctx.update(b"\0")
+    hash_ctx.update(_CHECKER_DRIVER_SRC.encode())
+    hash_ctx.update(f"\0g++ {' '.join(flags)}".encode())
+    driver_exe_path = os.path.join(cache_dir, f"checker_driver_{hash_ctx.hexdigest()}")
+
+    if os.path.exists(driver_exe_path):
+        logger.debug(f"Using cached checker driver: {driver_exe_path}")
+        return driver_exe_path
+
+    compile_dir = os.path.join(cache_dir, "checker-src")
+    os.makedirs(compile_dir, exist_ok=True)
+    _write_if_changed(os.path.join(compile_dir, "checker.cpp"), checker_content)
+    _write_if_changed(os.path.join(compile_dir, "testlib.h"), testlib_content)
+    _write_if_changed(os.path.join(compile_dir, "checker_driver.cpp"), _CHECKER_DRIVER_SRC)
+
+    checker_obj_path = os.path.join(compile_dir, "checker_main.o")
+    try:
+        # quiet: a wrapper-incompatible checker is an expected fallback, not
+        # something to spray g++ diagnostics over the console for
+        _run_gxx(
+            ["g++", *flags, "-Dmain=checker_main", "-c",
+             os.path.join(compile_dir, "checker.cpp"), "-o", checker_obj_path],
+            quiet=True,
+        )
+        _run_gxx(
+            ["g++", *flags, os.path.join(compile_dir, "checker_driver.cpp"),
+             checker_obj_path, "-o", driver_exe_path],
+            quiet=True,
+        )
+        logger.debug(f"Checker driver compiled successfully: {driver_exe_path}")
+        return driver_exe_path
+    except subprocess.CalledProcessError as exc:
+        logger.info(f"Checker is not driver-compatible, using one-shot runs: {exc}")
+        return None
+
+
+# One driver co-process per reporting thread; registered globally so the
+# report sweep can shut them all down once the suite is done.
+_worker_local = threading.local()
+_live_workers: list = []
+_workers_lock = threading.Lock()
+
+
+def _run_checker_via_driver(driver: str, input_file: str, participant_path: str, jury_path: str) -> Optional[Tuple[str, str]]:
+    """One verdict from this thread's driver co-process; None on any driver
+    failure so the caller can retry with a one-shot checker run."""
+    worker = getattr(_worker_local, "proc", None)
+    if worker is None or worker.poll() is not None:
+        try:
+            # stderr is discarded: verdict messages travel over the stdout
+            # pipe, and testlib's exit handler in the driver parent prints a
+            # spurious FAIL line to stderr when stdin closes at shutdown
+            worker = subprocess.Popen(
+                [driver], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, text=True, bufsize=1
+            )
+        except OSError as exc:
+            logger.warning(f"Failed to start checker driver: {exc}")
+            return None
+        _worker_local.proc = worker
+        with _workers_lock:
+            _live_workers.append(worker)
+    try:
+        worker.stdin.write(f"{input_file} {participant_path} {jury_path}\n")
+        worker.stdin.flush()
+        line = worker.stdout.readline()
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Checker driver pipe failed: {exc}")
+        _worker_local.proc = None
+        return None
+    if not line:
+        logger.warning("Checker driver exited unexpectedly, falling back to one-shot runs")
+        _worker_local.proc = None
+        return None
+    rc_str, _, msg = line.rstrip("\n").partition("\t")
+    try:
+        rc = int(rc_str)
+    except ValueError:
+        logger.warning(f"Unparseable checker driver reply: {line!r}")
+        return None
+    msg = msg.strip()
+    if rc == 0:
+        logger.debug("Checker returned AC")
+        return "AC", msg
+    if rc == 1:
+        logger.debug(f"Checker returned WA: {msg}")
+        return "WA", msg
+    logger.error(f"Checker failed with return code {rc}: {msg}")
+    return "WA", f"Checker error: {msg}"
+
+
+def _shutdown_checker_workers():
+    with _workers_lock:
+        workers = list(_live_workers)
+        _live_workers.clear()
+    for worker in workers:
+        try:
+            if worker.stdin:
+                worker.stdin.close()
+            worker.wait(timeout=5)
+        except Exception:
+            worker.kill()
+
+
+def _run_gxx(argv: list, quiet: bool = False):
+    """Spawn g++ via os.posix_spawn.
+
+    subprocess.run's default close_fds/cwd handling forces the fork()+exec()
+    path, which copies the parent's page tables — measurable once the
+    process has grown from a long in-session generation run. posix_spawn
+    uses vfork/clone under the hood and skips that. Raises
+    CalledProcessError on a non-zero exit, like the check=True it replaces.
+    """
+    file_actions = []
+    if quiet:
+        file_actions = [
+            (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0o644),
+            (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0o644),
+        ]
+    gxx = shutil.which("g++") or "g++"
+    pid = os.posix_spawn(gxx, argv, os.environ, file_actions=file_actions)
+    exitcode = os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+    if exitcode != 0:
+        raise subprocess.CalledProcessError(exitcode, argv)
+
+
+def _write_if_changed(path: str, content: str):
+    """Write content to path only when the on-disk bytes differ."""
+    try:
+        with open(path, "r") as f:
+            if f.read() == content:
+                return
+    except FileNotFoundError:
+        pass
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _verdict_cache_path(sol_code: str, input_digest: str, answer_digest: str, lang: str, checker_executable: Optional[str]) -> str:
+    """Cache file path for one (solution, test, answer, checker) combination."""
+    m = hashlib.blake2b(digest_size=16)
+    for part in (sol_code, input_digest, answer_digest, lang, checker_executable or ""):
+        m.update(part.encode())
+        m.update(b"\0")
+    return os.path.join(config.get_cache_dir_path(), "verdicts", m.hexdigest() + ".json")
+
+
+class TestSuite:
+    """Session-wide cache of one task's input and answer digests.
+
+    Reporting K solutions over the same N tests used to re-hash every file
+    K times; digests survive across report() calls, validated per entry
+    against (mtime_ns, size) so regenerated tests reload transparently.
+    prefetch() hashes ahead on a couple of reader threads so the digests
+    are ready by the time the sandbox runs ask for them; per-entry races
+    at worst duplicate a hash.
+    """
+
+    def __init__(self, tests_dir: str, task_name: str):
+        self.tests_dir = tests_dir
+        self.task_name = task_name
+        self._digests: dict = {}  # path -> ((mtime_ns, size), Future | str)
+        self._pool = ThreadPoolExecutor(max_workers=2)
+
+    def prefetch(self, test_entries):
+        """Submit background digests for the inputs (and their answers)
+        missing from or stale in the cache."""
+        for entry in test_entries:
+            self._submit(entry.path, entry.stat())
+            answer_path = entry.path.replace(".i", ".o")
+            try:
+                self._submit(answer_path, os.stat(answer_path))
+            except FileNotFoundError:
+                pass
+
+    def _submit(self, path: str, st):
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._digests.get(path)
+        if cached is not None and cached[0] == key:
+            return
+        self._digests[path] = (key, self._pool.submit(_file_digest, path))
+
+    def digest(self, path: str) -> str:
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._digests.get(path)
+        if cached is not None and cached[0] == key:
+            value = cached[1]
+            if not isinstance(value, str):
+                value = value.result()
+                self._digests[path] = (key, value)
+            return value
+        digest = _file_digest(path)
+        self._digests[path] = (key, digest)
+        return digest
+
+
+# One suite per (tests_dir, task_name), shared by every report() call in
+# the session so the second and later solutions skip the file I/O.
+_suite_cache: dict = {}
+_suite_cache_lock = threading.Lock()
+
+
+def _get_test_suite(tests_dir: str, task_name: str) -> TestSuite:
+    with _suite_cache_lock:
+        suite = _suite_cache.get((tests_dir, task_name))
+        if suite is None:
+            suite = TestSuite(tests_dir, task_name)
+            _suite_cache[(tests_dir, task_name)] = suite
+        return suite
+
+
+def _file_digest(path: str) -> str:
+    """Streaming blake2b of a file, so multi-MB answers never have to be
+    materialized in Python just to key the verdict cache."""
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, hashlib.blake2b).hexdigest()
+        m = hashlib.blake2b()
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            m.update(chunk)
+        return m.hexdigest()
+
+
+def _run_test(test_file: str, sol_code: str, lang: str, checker_executable: Optional[str], use_cache: bool = True, checker_driver: Optional[str] = None, suite: Optional[TestSuite] = None, precompiled: Optional[str] = None) -> TestCaseResult:
     logger.debug(f"Processing test file: {test_file}")
 
-    with open(test_file, "r") as f:
-        stdin = f.read()
-        logger.debug(f"Read input file, size: {len(stdin)} bytes")
+    # Both files enter the cache key only as digests, so neither the input
+    # nor the answer is ever materialized as a Python string.
+    input_digest = suite.digest(test_file) if suite is not None else _file_digest(test_file)
+    answer_file = test_file.replace(".i", ".o")
+    answer_digest = suite.digest(answer_file) if suite is not None else _file_digest(answer_file)
+    cache_path = _verdict_cache_path(sol_code, input_digest, answer_digest, lang, checker_executable)
+    if use_cache and os.path.exists(cache_path):
+        logger.debug(f"Using cached verdict: {cache_path}")
+        with open(cache_path, "r") as f:
+            return TestCaseResult(**json.load(f))
 
     logger.debug(f"Running solution in {lang} language")
+    # Without a checker the verdict only needs file equality, so stream the
+    # solution's stdout straight to the scratch file instead of buffering a
+    # potentially huge string in the parent.
+    # The input file is handed to the sandbox as the stdin descriptor, so
+    # the solution reads it at its own pace and peak memory stays bounded
+    # regardless of test size.
+    stream_out_path = _scratch_participant_path() if checker_executable is None else None
     if lang == "cpp":
-        run_result = run_cpp_code(sol_code, stdin=stdin)
+        run_result = run_cpp_code(sol_code, stdin="", stdin_path=test_file, stdout_path=stream_out_path, precompiled_path=precompiled)
     elif lang == "py":
-        run_result = run_py_code(sol_code, stdin=stdin)
+        run_result = run_py_code(sol_code, stdin="", stdin_path=test_file, stdout_path=stream_out_path)
     else:
         logger.error(f"Unsupported language: {lang}")
         raise ValueError(f"Unsupported language: {lang}")
@@ -172,11 +565,6 @@ def _run_test(test_file: str, sol_code: str, lang: str, checker_executable: Opti
     test_name = os.path.basename(test_file).split(".i")[1]
     logger.debug(f"Test name: {test_name}, execution status: {run_result.status}")
 
-    answer_file = test_file.replace(".i", ".o")
-    logger.debug(f"Reading answer from: {answer_file}")
-    with open(answer_file, "r") as f:
-        answer = f.read()
-
     verdict = "AC"
     checker_msg = "-"
 
@@ -189,33 +577,87 @@ def _run_test(test_file: str, sol_code: str, lang: str, checker_executable: Opti
     else:
         if checker_executable:
             logger.debug("Using checker to verify output")
-            verdict, checker_msg = _run_checker(checker_executable, test_file, run_result.stdout, answer)
+            verdict, checker_msg = _run_checker(checker_executable, test_file, run_result.stdout, answer_file, driver=checker_driver)
         else:
-            logger.debug("Using string comparison to verify output")
-            verdict = _string_compare(run_result.stdout, answer)
+            logger.debug("Using streaming comparison to verify output")
+            verdict = _stream_compare(stream_out_path, answer_file)
 
     logger.debug(
         f"Test {test_name} result: {verdict}, time: {run_result.exec_time:.2f}s, "
         f"memory: {run_result.cg_mem_kib/1024:.2f}MiB"
     )
 
-    return TestCaseResult(
+    result = TestCaseResult(
         verdict=verdict,
         exec_time=run_result.exec_time,
         mem_mib=run_result.cg_mem_kib / 1024,
         test_name=test_name,
         checker_msg=checker_msg,
     )
-
-
-def _run_checker(checker_executable: str, input_file: str, participant_output: str, jury_output: str) -> Tuple[str, str]:
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as participant_file:
-        participant_file.write(participant_output)
-        participant_path = participant_file.name
-
-    with tempfile.NamedTemporaryFile(mode="w", delete=False) as jury_file:
-        jury_file.write(jury_output)
-        jury_path = jury_file.name
+    _store_verdict(cache_path, result)
+    return result
+
+
+def _store_verdict(cache_path: str, result: TestCaseResult):
+    """Atomically persist a verdict (write to temp file, then rename)."""
+    verdict_dir = os.path.dirname(cache_path)
+    os.makedirs(verdict_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=verdict_dir, delete=False) as f:
+        json.dump(asdict(result), f)
+        tmp_path = f.name
+    os.rename(tmp_path, cache_path)
+
+
+def _scratch_dir() -> str:
+    return os.path.join(config.get_cache_dir_path(), "scratch")
+
+
+def _scratch_participant_path() -> str:
+    """Per-thread scratch file for the participant output.
+
+    Truncate-mode reuse of the same inode avoids the tempfile
+    create/unlink churn of a NamedTemporaryFile per test; keyed on
+    pid and thread id so parallel report workers never collide.
+    """
+    scratch_dir = _scratch_dir()
+    os.makedirs(scratch_dir, exist_ok=True)
+    return os.path.join(scratch_dir, f"participant_{os.getpid()}_{threading.get_ident()}")
+
+
+def _run_checker(checker_executable: str, input_file: str, participant_output: str, jury_path: str, driver: Optional[str] = None) -> Tuple[str, str]:
+    """Verdict from the testlib checker.
+
+    jury_path is the answer file already on disk; it is handed to the
+    checker as-is, so the expected output never passes through Python.
+    """
+    # The co-process protocol is whitespace-separated paths, and /dev/fd
+    # names are not visible across processes, so the driver path always uses
+    # the scratch file for the participant output. All three paths must be
+    # whitespace-free — the scratch path inherits the project directory's
+    # name via cache_dir, so it is just as suspect as the other two.
+    if driver is not None:
+        participant_path = _scratch_participant_path()
+        if not re.search(r"\s", input_file + participant_path + jury_path):
+            with open(participant_path, "w") as f:
+                f.write(participant_output)
+            verdict = _run_checker_via_driver(driver, input_file, participant_path, jury_path)
+            if verdict is not None:
+                return verdict
+            # driver unavailable or died mid-run; fall through to one-shot exec
+
+    pass_fds = ()
+    if hasattr(os, "memfd_create"):
+        # Anonymous in-memory file: the checker opens it as /dev/fd/N,
+        # so the participant output never touches disk and there is
+        # nothing to unlink
+        pfd = os.memfd_create("participant")
+        os.write(pfd, participant_output.encode())
+        participant_path = f"/dev/fd/{pfd}"
+        pass_fds = (pfd,)
+    else:
+        participant_path = _scratch_participant_path()
+        with open(participant_path, "w") as participant_file:
+            participant_file.write(participant_output)
 
     try:
         checker_cmd = [checker_executable, input_file, participant_path, jury_path]
@@ -225,6 +667,7 @@ def _run_checker(checker_executable: str, input_file: str, participant_output: s
             capture_output=True,
             text=True,
             timeout=5,
+            pass_fds=pass_fds,
         )
 
         if proc.returncode == 0:
@@ -244,45 +687,47 @@ def _run_checker(checker_executable: str, input_file: str, participant_output: s
         logger.error(f"Error running checker: {exc}")
         return "WA", f"Checker error: {exc}"
     finally:
-        logger.debug("Cleaning up temporary checker files")
-        os.unlink(participant_path)
-        os.unlink(jury_path)
-
-
-def _string_compare(participant_output: str, jury_output: str) -> str:
-    trim = lambda s: "\n".join(line.rstrip() for line in s.splitlines())
-    if trim(participant_output) != trim(jury_output):
-        logger.warning("Wrong answer detected via string comparison")
-        return "WA"
-    logger.debug("String comparison accepted the answer")
+        for fd in pass_fds:
+            os.close(fd)
+
+
+def _stream_compare(participant_path: str, jury_path: str) -> str:
+    """Line-by-line bytes comparison of the two output files.
+
+    Same verdict as comparing the trimmed strings (trailing whitespace and
+    trailing blank lines are ignored), but peak memory stays O(line) and
+    the scan short-circuits on the first mismatching line, so large
+    outputs never have to be materialized in Python.
+    """
+    with open(participant_path, "rb") as pf, open(jury_path, "rb") as jf:
+        for p_line, j_line in itertools.zip_longest(pf, jf, fillvalue=b""):
+            if p_line.rstrip() != j_line.rstrip():
+                logger.warning("Wrong answer detected via stream comparison")
+                return "WA"
+    logger.debug("Stream comparison accepted the answer")
     return "AC"
 
 
-def _initialize_report_file(output_path: str, include_checker_msg: bool):
-    with open(output_path, "w", newline="") as f:
-        writer = csv.writer(f, delimiter="\t")
-        if include_checker_msg:
-            writer.writerow(["test", "res", "[sec]", "[mib]", "msg"])
-        else:
-            writer.writerow(["test", "res", "[sec]", "[mib]"])
-    logger.debug(f"Created report file: {output_path}")
+def _write_report_header(writer, include_checker_msg: bool):
+    if include_checker_msg:
+        writer.writerow(["test", "res", "[sec]", "[mib]", "msg"])
+    else:
+        writer.writerow(["test", "res", "[sec]", "[mib]"])
 
 
-def _append_result(output_path: str, result: TestCaseResult, include_checker_msg: bool):
-    with open(output_path, "a", newline="") as f:
-        writer = csv.writer(f, delimiter="\t")
-        row = [
-            result.test_name + " ",
-            result.verdict,
-            f"{result.exec_time:.2f}",
-            f"{result.mem_mib:.2f}",
-        ]
-        if include_checker_msg:
-            if result.checker_msg:
-                row.append(result.checker_msg[:100])
-            else:
-                row.append("-")
-        writer.writerow(row)
+def _append_result(writer, result: TestCaseResult, include_checker_msg: bool):
+    row = [
+        result.test_name + " ",
+        result.verdict,
+        f"{result.exec_time:.2f}",
+        f"{result.mem_mib:.2f}",
+    ]
+    if include_checker_msg:
+        if result.checker_msg:
+            row.append(result.checker_msg[:100])
+        else:
+            row.append("-")
+    writer.writerow(row)
     logger.debug(
         f"Test {result.test_name}: {result.verdict}, "
         f"time: {result.exec_time:.2f}s, mem: {result.mem_mib:.2f}MiB"
@@ -1,50 +1,120 @@
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Optional
+
+# PyYAML is optional (this package has no hard dependencies); when present
+# its dumper handles escaping of arbitrary comments and, with the C
+# extension, serializes large suites faster than string formatting.
+try:
+    import yaml as _yaml
+    try:
+        from yaml import CSafeDumper as _YamlDumper
+    except ImportError:
+        from yaml import SafeDumper as _YamlDumper
+except ImportError:
+    _yaml = None
+    _YamlDumper = None
+
+
+# Bound .format methods of templates parsed once at import; the f-string
+# this replaces re-ran its interpolation inside flush_tg for every group.
+_TG_TPL = """
+    - groups: {g}
+      points: {p}
+      public: {pub}
+      subtask: {st}
+""".format
+_TG_TPL_COMMENT = """
+    - groups: {g}
+      points: {p}
+      public: {pub}
+      subtask: {st}
+      comment: {c}""".format
+
+
+@dataclass
+class TgRecord:
+    """One recorded test group; slotted since a record per group adds up
+    over large suites and the export loop touches every field."""
+    __slots__ = ("subtask", "tg_id", "points", "public", "comment")
+    subtask: int
+    tg_id: int
+    points: int
+    public: bool
+    comment: Optional[str]
+
+
 class TgYaml:
     def __init__(self):
         self.tg_info = []
 
     def record_tg(self, st, tg, pts, public=False, c=None):
-        self.tg_info.append({
-            "subtask": st,
-            "tg_id": tg,
-            "points": pts,
-            "public": public,
-            "comment": c
-        })
+        self.tg_info.append(TgRecord(st, tg, pts, public, c))
+
+    def _tg_bounds(self, tg_list):
+        # one pass instead of separate min()/max() walks with a lambda
+        # per element; record_tg callers usually append monotonically but
+        # that is not guaranteed, so both extrema are still tracked
+        mn = mx = tg_list[0].tg_id
+        for tg in tg_list[1:]:
+            v = tg.tg_id
+            if v < mn:
+                mn = v
+            elif v > mx:
+                mx = v
+        return mn, mx
 
     def _tg_interval(self, tg_list):
-        mn_tg = min(tg_list, key=lambda tg: tg["tg_id"])
-        mx_tg = max(tg_list, key=lambda tg: tg["tg_id"])
-        return f"[{mn_tg['tg_id']}, {mx_tg['tg_id']}]"
+        mn, mx = self._tg_bounds(tg_list)
+        return f"[{mn}, {mx}]"
 
     def export_yaml(self, yaml_path="task.yaml"):
-        f = open(yaml_path, "w")
-        f.write("""
+        if _yaml is not None:
+            return self._export_pyyaml(yaml_path)
+        # Build the document in memory and emit it with a single write: one
+        # syscall instead of one per group, and the handle is closed (the
+        # old per-group f.write version leaked it).
+        parts = ["""
 tests_groups:
     - groups: 0
       points: 0
       public: true
       subtask: 0
       comment: Piemēri
-    """)
-        flush_tg = lambda tgs: f.write(f"""
-    - groups: {self._tg_interval(tgs)}
-      points: {tgs[0]["points"]}
-      public: {tgs[0]["public"]}
-      subtask: {tgs[0]["subtask"]}
-{"      comment: " + tgs[0]["comment"] if tgs[0]["comment"] else ""}""")
-        tg_buffer = []
-        for tg in self.tg_info:
-            if len(tg_buffer) == 0:
-                tg_buffer.append(tg)
-            elif tg_buffer[-1]["subtask"] == tg["subtask"] and \
-                tg_buffer[-1]["public"] == tg["public"] and \
-                tg_buffer[-1]["points"] == tg["points"]:
-                tg_buffer.append(tg)
-            else:
-                flush_tg(tg_buffer)
-                tg_buffer = [tg]
-        if len(tg_buffer) > 0:
-            flush_tg(tg_buffer)
+    """]
+        # adjacent records with the same key form one emitted group, same
+        # as the manual buffer loop this replaces but iterated in C
+        for _, grp in groupby(self.tg_info, key=lambda tg: (tg.subtask, tg.public, tg.points)):
+            tgs = list(grp)
+            head = tgs[0]
+            tpl = _TG_TPL_COMMENT if head.comment else _TG_TPL
+            parts.append(tpl(g=self._tg_interval(tgs), p=head.points,
+                             pub=head.public, st=head.subtask, c=head.comment))
+        with open(yaml_path, "w") as f:
+            f.write("".join(parts))
+
+    def _export_pyyaml(self, yaml_path):
+        entries = [{
+            "groups": 0,
+            "points": 0,
+            "public": True,
+            "subtask": 0,
+            "comment": "Piemēri",
+        }]
+        for _, grp in groupby(self.tg_info, key=lambda tg: (tg.subtask, tg.public, tg.points)):
+            tgs = list(grp)
+            entry = {
+                "groups": list(self._tg_bounds(tgs)),
+                "points": tgs[0].points,
+                "public": tgs[0].public,
+                "subtask": tgs[0].subtask,
+            }
+            if tgs[0].comment:
+                entry["comment"] = tgs[0].comment
+            entries.append(entry)
+        with open(yaml_path, "w") as f:
+            _yaml.dump({"tests_groups": entries}, f, Dumper=_YamlDumper,
+                       sort_keys=False, allow_unicode=True, default_flow_style=None)
 
 default_tg_yaml = TgYaml()
 